@@ -1,13 +1,53 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from functools import cached_property, lru_cache
 from typing import Any, Dict
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 
-from utils.file_writer import write_report_file
-from utils.message_schema import HandoffMessage, AgentName
+from utils import _json
+from utils.file_writer import write_report_file, write_report_file_streaming
+from utils.markdown_renderer import render_report
+from utils.message_schema import HandoffMessage, SUPERVISOR, DOCUMENT_CREATOR
+
+
+PROMPT_CACHE_KEY = "document_creator_v1"
+
+
+_SYSTEM_PROMPT = (
+    "You are a document creation assistant. "
+    "Given structured research data about a company, craft a clear, "
+    "well-organized markdown report. Use headings, bullet points, and short paragraphs. "
+    "You must ONLY use the information present in the JSON. Do NOT fabricate products, "
+    "numbers, or boilerplate text like 'No detailed summary available', 'Not available', "
+    "or 'No products listed'. If a field's value is an empty string or an empty list, "
+    "you may omit that section instead of filling it with placeholder prose. "
+    "If the JSON includes a non-empty 'sources' list of URL strings, add a '## Sources' section and render "
+    "each source URL as a markdown bullet in the form '- URL'. "
+    "If the 'sources' list is empty or missing, still include a '## Sources' section containing exactly the "
+    "sentence 'No sources were provided.'. Do not invent, rewrite, or paraphrase this sentence. Never write "
+    "the phrase 'Details were limited in the research results.' anywhere in the report."
+)
+
+_HUMAN_PROMPT = (
+    "Company name: {company_name}\n\n"
+    "Structured research JSON:\n{research_json}\n\n"
+    "Write the full markdown report now."
+)
+
+
+def _llm_formatter_enabled() -> bool:
+    return os.getenv("USE_LLM_FORMATTER", "0") == "1"
+
+
+@lru_cache(maxsize=1)
+def _formatting_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([("system", _SYSTEM_PROMPT), ("human", _HUMAN_PROMPT)])
 
 
 class DocumentCreatorAgent:
@@ -15,91 +55,66 @@ class DocumentCreatorAgent:
     def __init__(self, model: ChatOpenAI) -> None:
         self.model = model
 
-        system_prompt = (
-            "You are a document creation assistant. "
-            "Given structured research data about a company, craft a clear, "
-            "well-organized markdown report. Use headings, bullet points, and short paragraphs. "
-            "You must ONLY use the information present in the JSON. Do NOT fabricate products, "
-            "numbers, or boilerplate text like 'No detailed summary available', 'Not available', "
-            "or 'No products listed'. If a field's value is an empty string or an empty list, "
-            "you may omit that section instead of filling it with placeholder prose. "
-            "If the JSON includes a non-empty 'sources' list of URL strings, add a '## Sources' section and render "
-            "each source URL as a markdown bullet in the form '- URL'. "
-            "If the 'sources' list is empty or missing, still include a '## Sources' section containing exactly the "
-            "sentence 'No sources were provided.'. Do not invent, rewrite, or paraphrase this sentence. Never write "
-            "the phrase 'Details were limited in the research results.' anywhere in the report."
+    @cached_property
+    def _formatting_chain(self) -> Runnable:
+        return (
+            _formatting_prompt()
+            | self.model.bind(extra_body={"prompt_cache_key": PROMPT_CACHE_KEY})
+            | StrOutputParser()
         )
 
-        self._formatting_chain = (
-            ChatPromptTemplate.from_messages(
-                [
-                    ("system", system_prompt),
-                    (
-                        "human",
-                        "Company name: {company_name}\n\n"
-                        "Structured research JSON:\n{research_json}\n\n"
-                        "Write the full markdown report now.",
-                    ),
-                ]
-            )
-            | self.model
-            | StrOutputParser()
+    async def _write_with_llm(self, company_name: str, research: Dict[str, Any]) -> str:
+        research_json = _json.dumps(research)
+        chunks = self._formatting_chain.astream(
+            {"company_name": company_name, "research_json": research_json}
+        )
+
+        with write_report_file_streaming(company_name=company_name, fmt="markdown") as f:
+            async for chunk in chunks:
+                f.write(chunk.encode("utf-8"))
+            return f.name
+
+    def _fail(self, message: HandoffMessage, error: str) -> HandoffMessage:
+        return HandoffMessage(
+            task_name=message.task_name,
+            payload=message.payload,
+            next_agent=SUPERVISOR,
+            status="failed",
+            error=error,
         )
 
     def run(self, message: HandoffMessage) -> HandoffMessage:
-        if message.next_agent != AgentName.DOCUMENT_CREATOR:
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error="DocumentCreator received message not addressed to it.",
-            )
+        return asyncio.run(self.arun(message))
+
+    async def arun(self, message: HandoffMessage) -> HandoffMessage:
+        if message.next_agent != DOCUMENT_CREATOR:
+            return self._fail(message, "DocumentCreator received message not addressed to it.")
 
         if message.task_name != "create_report":
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error=f"DocumentCreator cannot handle task_name={message.task_name}",
-            )
+            return self._fail(message, f"DocumentCreator cannot handle task_name={message.task_name}")
 
         payload = message.payload if isinstance(message.payload, dict) else {}
         company_name = payload.get("company_name")
         research: Dict[str, Any] | None = payload.get("research")
         if not company_name or research is None:
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error="DocumentCreator requires 'company_name' and 'research' in payload.",
-            )
+            return self._fail(message, "DocumentCreator requires 'company_name' and 'research' in payload.")
 
         try:
-            import json
-
-            research_json = json.dumps(research, indent=2, ensure_ascii=False)
-            markdown_report = self._formatting_chain.invoke(
-                {"company_name": company_name, "research_json": research_json}
-            )
-
-            file_path = write_report_file(content=markdown_report, company_name=company_name, fmt="markdown")
+            if _llm_formatter_enabled():
+                file_path = await self._write_with_llm(company_name, research)
+            else:
+                markdown_report = render_report(company_name, research)
+                file_path = await asyncio.to_thread(
+                    write_report_file, content=markdown_report, company_name=company_name, fmt="markdown"
+                )
 
             return HandoffMessage(
                 task_name=message.task_name,
                 payload={"message": f"Report created for {company_name}."},
-                next_agent=AgentName.SUPERVISOR,
+                next_agent=SUPERVISOR,
                 status="completed",
                 file_path=file_path,
             )
 
         except Exception as exc:
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error=str(exc),
-            )
\ No newline at end of file
+            return self._fail(message, str(exc))
\ No newline at end of file
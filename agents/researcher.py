@@ -1,35 +1,99 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-from typing import Any, Dict, List, Tuple
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from urllib.parse import urlparse
 
-from tavily import TavilyClient
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_openai import ChatOpenAI
 
-from utils.message_schema import HandoffMessage, AgentName
+from utils import _json
+from utils.hedging import hedge_delay_from_env, hedged
+from utils.http_client import get_http_client
+from utils.message_schema import HandoffMessage, SUPERVISOR, RESEARCHER
+from utils.response_cache import ResponseCache, get_default_response_cache, make_cache_key
 
 
 TAVILY_ENDPOINT = "https://api.tavily.com/search"
+PROMPT_CACHE_KEY = "researcher_extraction_v1"
+MAX_CONCURRENT_SEARCHES = 5
+COALESCED_MAX_RESULTS = 20
 
+_SECTION_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "products": ("product", "service", "offering", "solution", "platform"),
+    "financials": ("revenue", "financial", "profit", "earnings", "growth"),
+    "competitors": ("competitor", "rival", "alternative", "market share"),
+    "news": ("news", "announce", "launch", "today"),
+}
 
-def _tavily_search(query: str, max_results: int = 5) -> Dict[str, Any]:
+_TTL_SECONDS = 3600.0
+_CACHE_MAX_ENTRIES = 1024
+
+_TAVILY_CACHE: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
+_TAVILY_IN_FLIGHT: Dict[Tuple[str, int], Future] = {}
+_TAVILY_CACHE_LOCK = threading.Lock()
+
+def _fetch_tavily(query: str, max_results: int) -> Dict[str, Any]:
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         raise RuntimeError("Tavily API key not set")
 
     try:
-        client = TavilyClient(api_key=api_key)
-        data: Dict[str, Any] = client.search(query=query, max_results=max_results)
+        response = get_http_client().post(
+            TAVILY_ENDPOINT,
+            json={"query": query, "max_results": max_results},
+            headers={"Authorization": f"Bearer {api_key}"},
+        )
+        response.raise_for_status()
+        data: Dict[str, Any] = _json.loads(response.content)
         return data
     except Exception as exc:
         raise RuntimeError(f"Tavily client error: {exc}") from exc
 
 
+def _tavily_search(query: str, max_results: int = 5) -> Dict[str, Any]:
+    key = (query, max_results)
+
+    with _TAVILY_CACHE_LOCK:
+        cached = _TAVILY_CACHE.get(key)
+        if cached is not None and time.monotonic() - cached[0] < _TTL_SECONDS:
+            return cached[1]
+
+        in_flight = _TAVILY_IN_FLIGHT.get(key)
+        owner = in_flight is None
+        if owner:
+            in_flight = Future()
+            _TAVILY_IN_FLIGHT[key] = in_flight
+
+    if not owner:
+        return in_flight.result()
+
+    try:
+        data = _fetch_tavily(query, max_results)
+    except BaseException as exc:
+        with _TAVILY_CACHE_LOCK:
+            del _TAVILY_IN_FLIGHT[key]
+        in_flight.set_exception(exc)
+        raise
+
+    with _TAVILY_CACHE_LOCK:
+        _TAVILY_CACHE.pop(key, None)
+        _TAVILY_CACHE[key] = (time.monotonic(), data)
+        while len(_TAVILY_CACHE) > _CACHE_MAX_ENTRIES:
+            del _TAVILY_CACHE[next(iter(_TAVILY_CACHE))]
+        del _TAVILY_IN_FLIGHT[key]
+    in_flight.set_result(data)
+    return data
+
+
 def _build_queries(company_name: str) -> Dict[str, str]:
     base = company_name
     return {
@@ -41,165 +105,366 @@ def _build_queries(company_name: str) -> Dict[str, str]:
     }
 
 
-def _run_all_sections(company_name: str) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[str]]]:
-    queries = _build_queries(company_name)
-    results_by_section: Dict[str, List[Dict[str, Any]]] = {}
-    answers_by_section: Dict[str, List[str]] = {}
+async def _tavily_search_async(query: str, semaphore: asyncio.Semaphore, max_results: int = 5) -> Dict[str, Any]:
+    async with semaphore:
+        return await asyncio.to_thread(_tavily_search, query, max_results)
 
-    for section, query in queries.items():
-        section_results: List[Dict[str, Any]] = []
-        section_answers: List[str] = []
-        try:
-            data = _tavily_search(query)
-        except Exception as exc:
-            raise RuntimeError(f"Tavily search failed: {exc}")
 
+_DEDUP_CONTENT_PREFIX = 256
+_MAX_CHARS_PER_SECTION = 6000
+_MAX_CHARS_PER_RESULT = 1500
+_TOTAL_PROMPT_CHARS = 24_000
+
+_SECTION_MAX_RESULTS: Dict[str, int] = {
+    "overview": 3,
+    "products": 5,
+    "financials": 3,
+    "competitors": 3,
+    "news": 3,
+}
+
+
+def _trim_to_budget(section_texts: Dict[str, str], budget: int = _TOTAL_PROMPT_CHARS) -> Dict[str, str]:
+    lengths = sorted(len(t) for t in section_texts.values())
+    if sum(lengths) <= budget:
+        return section_texts
+
+    remaining = budget
+    level = 0
+    for i, length in enumerate(lengths):
+        share = remaining // (len(lengths) - i)
+        if length > share:
+            level = share
+            break
+        remaining -= length
+
+    return {section: text[:level] for section, text in section_texts.items()}
+
+
+def _extract_url(result: Dict[str, Any]) -> str:
+    src = result.get("source") or {}
+    return next(
+        (str(u).strip() for u in (result.get("url"), result.get("link"), src.get("url"), src.get("id")) if u),
+        "",
+    )
+
+
+def _assemble_sections(responses: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, str], List[str], Set[str]]:
+    section_texts: Dict[str, str] = {}
+    sources_urls: List[str] = []
+    urls_seen: Set[str] = set()
+    used: Set[str] = set()
+    empty_sections: Set[str] = set()
+
+    for section, data in responses.items():
         answer = data.get("answer") or ""
+        if not data.get("results") and not (isinstance(answer, str) and answer.strip()):
+            empty_sections.add(section)
+
+        parts: List[str] = []
+        remaining = _MAX_CHARS_PER_SECTION
+
         if isinstance(answer, str) and answer.strip():
-            section_answers.append(answer.strip())
+            answer = answer.strip()[:remaining]
+            parts.append(answer)
+            remaining -= len(answer)
+
+        for r in data.get("results") or []:
+            if not isinstance(r, dict):
+                continue
+            url = _extract_url(r)
+            if url and url not in urls_seen:
+                urls_seen.add(url)
+                sources_urls.append(url)
+
+            if remaining <= 0:
+                continue
+            content = r.get("content") or ""
+            fingerprint = content[:_DEDUP_CONTENT_PREFIX]
+            if (url and url in used) or (fingerprint and fingerprint in used):
+                continue
+            if url:
+                used.add(url)
+            if fingerprint:
+                used.add(fingerprint)
+            if content:
+                content = content[: min(_MAX_CHARS_PER_RESULT, remaining)]
+                parts.append(content)
+                remaining -= len(content)
+
+        section_texts[section] = "\n\n".join(parts)
+
+    return _trim_to_budget(section_texts), sources_urls, empty_sections
+
+
+async def _run_all_sections_async(company_name: str) -> Tuple[Dict[str, str], List[str], Set[str]]:
+    queries = _build_queries(company_name)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    try:
+        responses = await asyncio.gather(
+            *[_tavily_search_async(q, semaphore, _SECTION_MAX_RESULTS[section]) for section, q in queries.items()]
+        )
+    except Exception as exc:
+        raise RuntimeError(f"Tavily search failed: {exc}")
+
+    return _assemble_sections(dict(zip(queries, responses)))
+
 
-        results = data.get("results") or []
-        for r in results:
-            if isinstance(r, dict):
-                section_results.append(r)
+def _run_all_sections(company_name: str) -> Tuple[Dict[str, str], List[str], Set[str]]:
+    queries = _build_queries(company_name)
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SEARCHES) as executor:
+            responses = list(
+                executor.map(_tavily_search, queries.values(), [_SECTION_MAX_RESULTS[section] for section in queries])
+            )
+    except Exception as exc:
+        raise RuntimeError(f"Tavily search failed: {exc}")
+
+    return _assemble_sections(dict(zip(queries, responses)))
 
-        results_by_section[section] = section_results
-        answers_by_section[section] = section_answers
 
-    return results_by_section, answers_by_section
+def _coalesce_search_enabled() -> bool:
+    return os.getenv("RESEARCHER_COALESCE_SEARCH", "0") == "1"
 
 
-def _collect_text(results: List[Dict[str, Any]], answers: List[str]) -> str:
-    parts: List[str] = []
-    for a in answers:
-        if a:
-            parts.append(a)
-    for r in results:
-        content = r.get("content") or ""
-        if content:
-            parts.append(content)
-    return "\n\n".join(parts)
+def _bucket_result(result: Dict[str, Any]) -> str:
+    haystack = f"{result.get('title') or ''} {result.get('content') or ''}".lower()
+    for section, keywords in _SECTION_KEYWORDS.items():
+        if any(k in haystack for k in keywords):
+            return section
+    return "overview"
+
+
+def _run_coalesced_search(company_name: str) -> Tuple[Dict[str, str], List[str], Set[str]]:
+    query = f"{company_name} overview products financials competitors news"
+    try:
+        data = _tavily_search(query, max_results=COALESCED_MAX_RESULTS)
+    except Exception as exc:
+        raise RuntimeError(f"Tavily search failed: {exc}")
+
+    responses: Dict[str, Dict[str, Any]] = {
+        section: {"answer": "", "results": []} for section in _build_queries(company_name)
+    }
+    responses["overview"]["answer"] = data.get("answer") or ""
+
+    for r in data.get("results") or []:
+        if isinstance(r, dict):
+            responses[_bucket_result(r)]["results"].append(r)
+
+    section_texts, sources_urls, _ = _assemble_sections(responses)
+    # Buckets are keyword guesses, so only a wholly empty response marks sections as empty.
+    if responses["overview"]["answer"] or data.get("results"):
+        return section_texts, sources_urls, set()
+    return section_texts, sources_urls, set(section_texts)
+
+
+_HUMAN_PROMPT = (
+    "Company name: {company_name}\n\n"
+    "{section_texts}\n\n"
+    "Candidate source URLs (one per line):\n{sources_urls}\n\n"
+    "Produce the strict JSON now."
+)
+
+_SECTION_FIELD_DEFAULTS: Dict[str, Tuple[str, Callable[[], Any]]] = {
+    "products": ("products", list),
+    "financials": ("financials", str),
+    "competitors": ("competitors", list),
+}
+
+
+def _format_section_texts(section_texts: Dict[str, str]) -> str:
+    return "\n\n".join(
+        f"{section.capitalize()} texts:\n{text}" for section, text in section_texts.items() if text
+    )
+
+
+_PROMPT_INTRO = (
+    "You are a company research extraction engine. "
+    "You are given pre-fetched Tavily search texts for a company. "
+)
+
+_PROMPT_RULES = (
+    "Do NOT use boilerplate placeholders like 'No information found', 'Data not available', or 'Details were limited'. "
+    "When information is sparse, return '' (empty string) or [] (empty list) for that field instead. "
+    "Only use the content provided. "
+    "Return ONLY valid JSON and nothing else."
+)
+
+_ASPECT_INSTRUCTIONS: Dict[str, str] = {
+    "summary": "'summary': 1-3 paragraphs summarizing the company and its main business, if possible.",
+    "products": "'products': list of key product or solution names (strings). If you cannot identify any, use an empty list [].",
+    "financials": "'financials': short prose summarizing revenue/profit/financial highlights. If nothing concrete is found, use an empty string ''.",
+    "competitors": (
+        "'competitors': list of competitor company names (strings). If you cannot identify any, use an empty list []. "
+        "Identify competitors based on the inferred industry. If the company is a tech company, list tech competitors. "
+        "If it is a cybersecurity company, list cybersecurity competitors."
+    ),
+}
+
+_SYSTEM_PROMPT = (
+    _PROMPT_INTRO
+    + "Using ONLY the provided texts and URLs, you must produce strict JSON with keys: "
+    "company, summary, products, financials, competitors.\n"
+    + "".join(f"- {instruction}\n" for instruction in _ASPECT_INSTRUCTIONS.values())
+    + "The 'sources' field will be populated programmatically from the Tavily results; "
+    "do NOT attempt to create or modify it in the JSON.\n"
+    + _PROMPT_RULES
+)
+
+
+def _parallel_extraction_enabled() -> bool:
+    return os.getenv("RESEARCHER_PARALLEL_EXTRACTION", "0") == "1"
+
+
+@lru_cache(maxsize=1)
+def _extraction_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([("system", _SYSTEM_PROMPT), ("human", _HUMAN_PROMPT)])
+
+
+def _aspect_system_prompt(aspect: str) -> str:
+    return (
+        _PROMPT_INTRO
+        + f"Using ONLY the provided texts and URLs, you must produce strict JSON with exactly one key, '{aspect}'.\n"
+        + f"- {_ASPECT_INSTRUCTIONS[aspect]}\n"
+        + _PROMPT_RULES
+    )
+
+
+@lru_cache(maxsize=None)
+def _aspect_prompt(aspect: str) -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([("system", _aspect_system_prompt(aspect)), ("human", _HUMAN_PROMPT)])
+
+
+# Folded into every extraction cache key so entries written under an older
+# prompt (e.g. in Redis) are never served after the prompt text changes.
+_PROMPT_VERSION = make_cache_key(
+    PROMPT_CACHE_KEY,
+    {
+        "system": _SYSTEM_PROMPT,
+        "human": _HUMAN_PROMPT,
+        "aspects": {aspect: _aspect_system_prompt(aspect) for aspect in _ASPECT_INSTRUCTIONS},
+    },
+)
 
 
 class ResearcherAgent:
 
-    def __init__(self, model: ChatOpenAI) -> None:
+    def __init__(self, model: ChatOpenAI, cache: Optional[ResponseCache] = None) -> None:
         self.model = model
-
-        system_prompt = (
-            "You are a company research extraction engine. "
-            "You are given pre-fetched Tavily search texts for a company. "
-            "Using ONLY the provided texts and URLs, you must produce strict JSON with keys: "
-            "company, summary, products, financials, competitors.\n"
-            "- 'summary': 13 paragraphs summarizing the company and its main business, if possible.\n"
-            "- 'products': list of key product or solution names (strings). If you cannot identify any, use an empty list [].\n"
-            "- 'financials': short prose summarizing revenue/profit/financial highlights. If nothing concrete is found, use an empty string ''.\n"
-            "- 'competitors': list of competitor company names (strings). If you cannot identify any, use an empty list [].\n"
-            "The 'sources' field will be populated programmatically from the Tavily results; do NOT attempt to create or modify it in the JSON.\n"
-            "Do NOT use boilerplate placeholders like 'No information found', 'Data not available', or 'Details were limited'. "
-            "When information is sparse, return '' (empty string) or [] (empty list) for that field instead. "
-            "Return ONLY valid JSON and nothing else."
+        self.cache = cache if cache is not None else get_default_response_cache()
+
+    @cached_property
+    def _extraction_chain(self) -> Runnable:
+        return (
+            _extraction_prompt()
+            | self.model.bind(
+                response_format={"type": "json_object"},
+                extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
+            )
+            | StrOutputParser()
         )
 
-        self._extraction_chain = (
-            ChatPromptTemplate.from_messages(
-                [
-                    ("system", system_prompt),
-                    (
-                        "human",
-                        "Company name: {company_name}\n\n"
-                        "Overview texts:\n{overview_text}\n\n"
-                        "Products texts:\n{products_text}\n\n"
-                        "Financials texts:\n{financials_text}\n\n"
-                        "Competitors texts:\n{competitors_text}\n\n"
-                        "News texts:\n{news_text}\n\n"
-                        "Candidate source URLs (one per line):\n{sources_urls}\n\n"
-                        "Identify competitors based on the inferred industry. If the company is a tech company, list tech competitors. "
-                        "If it is a cybersecurity company, list cybersecurity competitors. Only use the content provided.\n\n"
-                        "Produce the strict JSON now.",
-                    ),
-                ]
+    @cached_property
+    def _aspect_chains(self) -> Dict[str, Runnable]:
+        return {
+            aspect: (
+                _aspect_prompt(aspect)
+                | self.model.bind(
+                    response_format={"type": "json_object"},
+                    extra_body={"prompt_cache_key": f"{PROMPT_CACHE_KEY}_{aspect}"},
+                )
+                | StrOutputParser()
+            )
+            for aspect in _ASPECT_INSTRUCTIONS
+        }
+
+    @cached_property
+    def _model_id(self) -> Optional[str]:
+        model_name = getattr(self.model, "model_name", None)
+        if not model_name:
+            return None
+        return f"{type(self.model).__qualname__}:{model_name}"
+
+    async def _extract(self, chain: Runnable, namespace: str, chain_input: Dict[str, str]) -> Dict[str, Any]:
+        if self._model_id is None:
+            raw_json = await hedged(lambda: chain.ainvoke(chain_input), hedge_delay_from_env())
+            return _json.loads(raw_json)
+
+        cache_key = make_cache_key(
+            f"{_PROMPT_VERSION}:{namespace}",
+            {**chain_input, "model": self._model_id},
+        )
+        cached_json = self.cache.get(cache_key)
+        if cached_json is not None:
+            raw_json = cached_json
+        else:
+            raw_json = await hedged(lambda: chain.ainvoke(chain_input), hedge_delay_from_env())
+
+        structured: Dict[str, Any] = _json.loads(raw_json)
+
+        if cached_json is None:
+            self.cache.set(cache_key, raw_json)
+        return structured
+
+    async def _extract_by_aspect(self, chain_input: Dict[str, str], empty_sections: Set[str]) -> Dict[str, Any]:
+        aspects = [aspect for aspect in self._aspect_chains if aspect not in empty_sections]
+        results = await asyncio.gather(
+            *(
+                self._extract(self._aspect_chains[aspect], f"researcher_extraction_{aspect}", chain_input)
+                for aspect in aspects
             )
-            | self.model
-            | StrOutputParser()
         )
+        return {aspect: result[aspect] for aspect, result in zip(aspects, results) if aspect in result}
+
+    def _fail(self, message: HandoffMessage, error: str) -> HandoffMessage:
+        return HandoffMessage(
+            task_name=message.task_name,
+            payload=message.payload,
+            next_agent=SUPERVISOR,
+            status="failed",
+            error=error,
+        )
+
+    def as_runnable(self) -> Runnable:
+        return RunnableLambda(self.run, afunc=self.arun)
 
     def run(self, message: HandoffMessage) -> HandoffMessage:
-        if message.next_agent != AgentName.RESEARCHER:
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error="Researcher received message not addressed to it.",
-            )
+        return asyncio.run(self.arun(message))
+
+    async def arun(self, message: HandoffMessage) -> HandoffMessage:
+        if message.next_agent != RESEARCHER:
+            return self._fail(message, "Researcher received message not addressed to it.")
 
         if message.task_name != "company_research":
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error=f"Researcher cannot handle task_name={message.task_name}",
-            )
+            return self._fail(message, f"Researcher cannot handle task_name={message.task_name}")
 
         company_name = message.payload.get("company_name") if isinstance(message.payload, dict) else None
         if not company_name:
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error="Researcher requires 'company_name' in payload.",
-            )
+            return self._fail(message, "Researcher requires 'company_name' in payload.")
 
         try:
-            results_by_section, answers_by_section = _run_all_sections(company_name)
-
-            overview_text = _collect_text(results_by_section.get("overview", []), answers_by_section.get("overview", []))
-            products_text = _collect_text(results_by_section.get("products", []), answers_by_section.get("products", []))
-            financials_text = _collect_text(results_by_section.get("financials", []), answers_by_section.get("financials", []))
-            competitors_text = _collect_text(results_by_section.get("competitors", []), answers_by_section.get("competitors", []))
-            news_text = _collect_text(results_by_section.get("news", []), answers_by_section.get("news", []))
-            urls_seen: set[str] = set()
-            sources_urls: List[str] = []
-            for section_results in results_by_section.values():
-                for r in section_results:
-                    if not isinstance(r, dict):
-                        continue
-                    source_obj = r.get("source") or {}
-                    raw_url = (
-                        r.get("url")
-                        or r.get("link")
-                        or source_obj.get("url")
-                        or source_obj.get("id")
-                        or ""
-                    )
-                    url = str(raw_url).strip()
-                    if not url or url in urls_seen:
-                        continue
-                    urls_seen.add(url)
-                    sources_urls.append(url)
-
-            sources_urls_str = "\n".join(sources_urls)
-            raw_json = self._extraction_chain.invoke(
-                {
+            if _coalesce_search_enabled():
+                section_texts, sources_urls, empty_sections = await asyncio.to_thread(_run_coalesced_search, company_name)
+            else:
+                section_texts, sources_urls, empty_sections = await _run_all_sections_async(company_name)
+
+            formatted_sections = _format_section_texts(section_texts)
+            if formatted_sections:
+                chain_input = {
                     "company_name": company_name,
-                    "overview_text": overview_text,
-                    "products_text": products_text,
-                    "financials_text": financials_text,
-                    "competitors_text": competitors_text,
-                    "news_text": news_text,
-                    "sources_urls": sources_urls_str,
+                    "section_texts": formatted_sections,
+                    "sources_urls": "\n".join(sources_urls),
                 }
-            )
+                if _parallel_extraction_enabled():
+                    structured = await self._extract_by_aspect(chain_input, empty_sections)
+                else:
+                    structured = await self._extract(self._extraction_chain, "researcher_extraction", chain_input)
+            else:
+                structured = {}
 
-            try:
-                structured: Dict[str, Any] = json.loads(raw_json)
-            except json.JSONDecodeError:
-                start = raw_json.find("{")
-                end = raw_json.rfind("}") + 1
-                structured = json.loads(raw_json[start:end])
+            for section, (field, default_factory) in _SECTION_FIELD_DEFAULTS.items():
+                if section in empty_sections:
+                    structured[field] = default_factory()
 
             allowed = {"company", "summary", "products", "financials", "competitors", "sources"}
             structured = {k: v for k, v in structured.items() if k in allowed}
@@ -216,15 +481,9 @@ class ResearcherAgent:
             return HandoffMessage(
                 task_name=message.task_name,
                 payload=structured,
-                next_agent=AgentName.SUPERVISOR,
+                next_agent=SUPERVISOR,
                 status="completed",
             )
 
         except Exception as exc:
-            return HandoffMessage(
-                task_name=message.task_name,
-                payload=message.payload,
-                next_agent=AgentName.SUPERVISOR,
-                status="failed",
-                error=str(exc),
-            )
+            return self._fail(message, str(exc))
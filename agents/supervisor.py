@@ -1,13 +1,38 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+import asyncio
+import os
+from functools import cached_property, lru_cache
+from operator import itemgetter
 from typing import Any
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnableParallel
 from langchain_openai import ChatOpenAI
 
-from utils.message_schema import HandoffMessage, AgentName
+from utils.message_schema import HandoffMessage, SUPERVISOR, RESEARCHER, DOCUMENT_CREATOR
+
+
+PROMPT_CACHE_KEY = "supervisor_v1"
+
+_SYSTEM_PROMPT = (
+    "You are a supervisor agent coordinating a research workflow. "
+    "Your job is to understand the user request and pass clear, concise "
+    "instructions to specialized agents. Do NOT perform their tasks yourself. "
+    "Summarize each user request you receive as a short research instruction for a researcher agent."
+)
+
+_HUMAN_PROMPT = "{user_request}"
+
+
+def _thinking_enabled() -> bool:
+    return os.getenv("SUPERVISOR_THINK", "0") == "1"
+
+
+@lru_cache(maxsize=1)
+def _thinking_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([("system", _SYSTEM_PROMPT), ("human", _HUMAN_PROMPT)])
 
 
 class SupervisorAgent:
@@ -22,32 +47,27 @@ class SupervisorAgent:
         self.researcher = researcher
         self.document_creator = document_creator
 
-        system_prompt = (
-            "You are a supervisor agent coordinating a research workflow. "
-            "Your job is to understand the user request and pass clear, concise "
-            "instructions to specialized agents. Do NOT perform their tasks yourself."
-        )
-        self._thinking_chain = (
-            ChatPromptTemplate.from_messages(
-                [
-                    ("system", system_prompt),
-                    (
-                        "human",
-                        "User request: {user_request}\n\n"
-                        "Summarize the request as a short research instruction for a researcher agent.",
-                    ),
-                ]
-            )
-            | self.model
+    @cached_property
+    def _thinking_chain(self) -> Runnable:
+        return (
+            _thinking_prompt()
+            | self.model.bind(extra_body={"prompt_cache_key": PROMPT_CACHE_KEY})
             | StrOutputParser()
         )
 
-    def _interpret_request(self, user_request: str) -> str:
-        return self._thinking_chain.invoke({"user_request": user_request}).strip()
+    @cached_property
+    def _think_and_research(self) -> Runnable:
+        return RunnableParallel(
+            think=self._thinking_chain,
+            research=itemgetter("message") | self.researcher.as_runnable(),
+        )
 
     def run(self, message: HandoffMessage) -> HandoffMessage:
+        return asyncio.run(self.arun(message))
+
+    async def arun(self, message: HandoffMessage) -> HandoffMessage:
         try:
-            if message.next_agent != AgentName.SUPERVISOR:
+            if message.next_agent != SUPERVISOR:
                 raise ValueError("Supervisor.run must be entered with next_agent=SUPERVISOR")
 
             if message.task_name != "research_company":
@@ -57,21 +77,25 @@ class SupervisorAgent:
             if not company_name:
                 raise ValueError("Supervisor requires 'company_name' in payload to start workflow")
 
-            _ = self._interpret_request(f"Research the company {company_name}")
-
             to_researcher = HandoffMessage(
                 task_name="company_research",
                 payload={"company_name": company_name},
-                next_agent=AgentName.RESEARCHER,
+                next_agent=RESEARCHER,
                 status="in_progress",
             )
 
-            researcher_result = self.researcher.run(to_researcher)
+            if _thinking_enabled():
+                outputs = await self._think_and_research.ainvoke(
+                    {"user_request": f"Research the company {company_name}", "message": to_researcher}
+                )
+                researcher_result = outputs["research"]
+            else:
+                researcher_result = await self.researcher.arun(to_researcher)
             if researcher_result.status != "completed":
                 return HandoffMessage(
                     task_name=message.task_name,
-                    payload=asdict(researcher_result),
-                    next_agent=AgentName.SUPERVISOR,
+                    payload={"prior_payload": researcher_result.payload, "prior_status": researcher_result.status},
+                    next_agent=SUPERVISOR,
                     status="failed",
                     error=researcher_result.error or "Researcher did not complete successfully",
                 )
@@ -83,16 +107,16 @@ class SupervisorAgent:
                     "company_name": company_name,
                     "research": research_payload,
                 },
-                next_agent=AgentName.DOCUMENT_CREATOR,
+                next_agent=DOCUMENT_CREATOR,
                 status="in_progress",
             )
 
-            doc_result = self.document_creator.run(to_doc)
+            doc_result = await self.document_creator.arun(to_doc)
             if doc_result.status != "completed" or not doc_result.file_path:
                 return HandoffMessage(
                     task_name=message.task_name,
-                    payload=asdict(doc_result),
-                    next_agent=AgentName.SUPERVISOR,
+                    payload={"prior_payload": doc_result.payload, "prior_status": doc_result.status},
+                    next_agent=SUPERVISOR,
                     status="failed",
                     error=doc_result.error or "Document creator did not produce a file",
                 )
@@ -111,8 +135,8 @@ class SupervisorAgent:
         except Exception as exc:
             return HandoffMessage(
                 task_name=message.task_name,
-                payload=asdict(message),
-                next_agent=AgentName.SUPERVISOR,
+                payload={"prior_payload": message.payload, "prior_status": message.status},
+                next_agent=SUPERVISOR,
                 status="failed",
                 error=str(exc),
             )
\ No newline at end of file
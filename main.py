@@ -1,49 +1,146 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import asyncio
 import os
-from typing import Optional
+import weakref
+from typing import List, Optional
+
+import httpx
 
 from agents.supervisor import SupervisorAgent
 from agents.researcher import ResearcherAgent
 from agents.document_creator import DocumentCreatorAgent
-from utils.message_schema import HandoffMessage, AgentName
+from utils.message_schema import HandoffMessage, SUPERVISOR
+from utils.http_client import aclose_async_http_client, get_async_http_client
+from utils.report_cache import get_cached_report, store_report
 
 from langchain_openai import ChatOpenAI
 
 
-def build_model() -> ChatOpenAI:
+def build_model(http_async_client: Optional[httpx.AsyncClient] = None) -> ChatOpenAI:
     model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.2"))
+    timeout = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable not set.")
-    return ChatOpenAI(model=model_name, temperature=temperature, api_key=api_key)
+    return ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        api_key=api_key,
+        timeout=timeout,
+        max_retries=max_retries,
+        http_async_client=http_async_client,
+    )
+
+
+def build_supervisor(model: ChatOpenAI) -> SupervisorAgent:
+    return SupervisorAgent(
+        model=model,
+        researcher=ResearcherAgent(model=model),
+        document_creator=DocumentCreatorAgent(model=model),
+    )
+
 
+# Each event loop gets its own supervisor whose model uses that loop's
+# httpx.AsyncClient; langchain-openai's default async client is process-wide.
+_SUPERVISORS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SupervisorAgent]" = (
+    weakref.WeakKeyDictionary()
+)
 
-def run_supervisor(company_name: str, model: Optional[ChatOpenAI] = None) -> HandoffMessage:
+
+def get_supervisor() -> SupervisorAgent:
+    loop = asyncio.get_running_loop()
+    supervisor = _SUPERVISORS.get(loop)
+    if supervisor is None:
+        supervisor = _SUPERVISORS[loop] = build_supervisor(
+            build_model(http_async_client=get_async_http_client())
+        )
+    return supervisor
+
+
+async def arun_supervisor(
+    company_name: str,
+    model: Optional[ChatOpenAI] = None,
+    use_cache: bool = True,
+    supervisor: Optional[SupervisorAgent] = None,
+) -> HandoffMessage:
     if not company_name or not company_name.strip():
         raise ValueError("company_name must be a non-empty string")
 
-    if model is None:
-        model = build_model()
-
-    researcher = ResearcherAgent(model=model)
-    document_creator = DocumentCreatorAgent(model=model)
-    supervisor = SupervisorAgent(
-        model=model,
-        researcher=researcher,
-        document_creator=document_creator,
-    )
+    use_cache = use_cache and model is None and supervisor is None
+    if use_cache:
+        cached = await asyncio.to_thread(get_cached_report, company_name)
+        if cached is not None:
+            return HandoffMessage(
+                task_name="research_company",
+                payload={
+                    "message": f"Research report for {company_name.strip()} loaded from cache.",
+                    "research": cached["research"],
+                },
+                next_agent=None,
+                status="completed",
+                file_path=cached["file_path"],
+            )
+
+    if supervisor is None:
+        supervisor = get_supervisor() if model is None else build_supervisor(model)
 
     initial_message = HandoffMessage(
         task_name="research_company",
         payload={"company_name": company_name.strip()},
-        next_agent=AgentName.SUPERVISOR,
+        next_agent=SUPERVISOR,
         status="pending",
     )
 
-    return supervisor.run(initial_message)
+    result = await supervisor.arun(initial_message)
+    if use_cache and result.status == "completed" and result.file_path:
+        await asyncio.to_thread(store_report, company_name, result.file_path, result.payload.get("research"))
+    return result
+
+
+def run_supervisor(
+    company_name: str,
+    model: Optional[ChatOpenAI] = None,
+    use_cache: bool = True,
+) -> HandoffMessage:
+    async def _run() -> HandoffMessage:
+        try:
+            return await arun_supervisor(company_name, model=model, use_cache=use_cache)
+        finally:
+            _SUPERVISORS.pop(asyncio.get_running_loop(), None)
+            await aclose_async_http_client()
+
+    return asyncio.run(_run())
+
+
+async def run_supervisor_batch(
+    company_names: List[str],
+    model: Optional[ChatOpenAI] = None,
+    max_concurrency: int = 10,
+    use_cache: bool = True,
+) -> List[HandoffMessage]:
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    supervisor = None if model is None else build_supervisor(model)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _one(name: str) -> HandoffMessage:
+        if not name or not name.strip():
+            return HandoffMessage(
+                task_name="research_company",
+                payload={"company_name": name},
+                next_agent=None,
+                status="failed",
+                error="company_name must be a non-empty string",
+            )
+        async with semaphore:
+            return await arun_supervisor(name, use_cache=use_cache, supervisor=supervisor)
+
+    return list(await asyncio.gather(*(_one(name) for name in company_names)))
 
 
 def main() -> None:
@@ -0,0 +1,20 @@
+import unittest
+
+from utils import _json
+
+
+class _TextSubclass(str):
+    pass
+
+
+class LoadsTests(unittest.TestCase):
+
+    def test_accepts_str_subclass(self) -> None:
+        self.assertEqual(_json.loads(_TextSubclass('{"company": "Acme"}')), {"company": "Acme"})
+
+    def test_accepts_bytes(self) -> None:
+        self.assertEqual(_json.loads(b'{"products": []}'), {"products": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, Union
+
+import orjson
+
+
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def dumps(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> str:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, option=option).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    # orjson rejects str subclasses (e.g. langchain-core's TextAccessor).
+    if isinstance(data, str) and type(data) is not str:
+        data = str(data)
+    return orjson.loads(data)
+
+
+__all__ = ["dumps", "loads", "JSONDecodeError"]
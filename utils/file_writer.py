@@ -1,44 +1,163 @@
 from __future__ import annotations
 
-from datetime import datetime
+import io
+import re
+import time
+import zipfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Literal
-
-from docx import Document
+from typing import IO, Iterable, Iterator, Literal, Union
+from xml.sax.saxutils import escape
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUTS_DIR = ROOT_DIR / "outputs"
 
+_SLUG_RE = re.compile(r"[\W_]+")
+
+_outputs_ready = False
+
+_WRITE_BUFFER_SIZE = 1 << 20
+
+_XML_INVALID_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+_DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"/>'
+)
+_DOCX_DOCUMENT_HEAD = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+)
+_DOCX_DOCUMENT_TAIL = b"</w:body></w:document>"
+
 
 def _ensure_outputs_dir() -> None:
-    OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+    global _outputs_ready
+    if not _outputs_ready:
+        OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+        _outputs_ready = True
 
 
 def _slugify(value: str) -> str:
-    return "".join(c.lower() if c.isalnum() else "-" for c in value).strip("-") or "report"
+    return _SLUG_RE.sub("-", value.lower()).strip("-") or "report"
+
+
+def _build_base_name(company_name: str) -> str:
+    now_ns = time.time_ns()
+    timestamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now_ns // 1_000_000_000))
+    return f"{_slugify(company_name)}-{timestamp}-{now_ns // 1000 % 1_000_000:06d}"
+
+
+def _reserve_path(company_name: str, suffix: str) -> Path:
+    base_name = _build_base_name(company_name)
+    attempt = 0
+    while True:
+        name = base_name if attempt == 0 else f"{base_name}-{attempt}"
+        file_path = OUTPUTS_DIR / f"{name}{suffix}"
+        try:
+            file_path.open("xb").close()
+        except FileExistsError:
+            attempt += 1
+            continue
+        return file_path
+
+
+def _iter_lines(content: Union[str, Iterable[str]]) -> Iterator[str]:
+    if isinstance(content, str):
+        for line in io.StringIO(content):
+            yield line.rstrip("\r\n")
+        return
+
+    pending = ""
+    for chunk in content:
+        *lines, pending = (pending + chunk).split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    if pending:
+        yield pending
+
+
+def _fast_docx(file_path: Path, lines: Iterable[str]) -> None:
+    with zipfile.ZipFile(file_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        zf.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _DOCX_RELS)
+        zf.writestr("word/_rels/document.xml.rels", _DOCX_DOCUMENT_RELS)
+        with zf.open("word/document.xml", "w") as f:
+            f.write(_DOCX_DOCUMENT_HEAD)
+            for line in lines:
+                text = escape(_XML_INVALID_RE.sub("", line))
+                if text:
+                    f.write(f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'.encode("utf-8"))
+                else:
+                    f.write(b"<w:p/>")
+            f.write(_DOCX_DOCUMENT_TAIL)
 
 
 def write_report_file(
-    content: str,
+    content: Union[str, Iterable[str]],
     company_name: str,
     fmt: Literal["markdown", "docx"] = "markdown",
+    rich: bool = False,
 ) -> str:
     _ensure_outputs_dir()
 
-    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-    base_name = f"{_slugify(company_name)}-{timestamp}"
-
     if fmt == "markdown":
-        file_path = OUTPUTS_DIR / f"{base_name}.md"
-        file_path.write_text(content, encoding="utf-8")
+        file_path = _reserve_path(company_name, ".md")
+        if isinstance(content, str):
+            file_path.write_bytes(content.encode("utf-8"))
+        else:
+            with file_path.open("wb", buffering=_WRITE_BUFFER_SIZE) as f:
+                for chunk in content:
+                    f.write(chunk.encode("utf-8"))
     elif fmt == "docx":
-        file_path = OUTPUTS_DIR / f"{base_name}.docx"
-        doc = Document()
-        for line in content.splitlines():
-            doc.add_paragraph(line)
-        doc.save(file_path)
+        file_path = _reserve_path(company_name, ".docx")
+        if rich:
+            from docx import Document
+
+            doc = Document()
+            for line in _iter_lines(content):
+                doc.add_paragraph(line)
+            doc.save(file_path)
+        else:
+            _fast_docx(file_path, _iter_lines(content))
     else:
         raise ValueError(f"Unsupported report format: {fmt}")
 
     return str(file_path)
+
+
+@contextmanager
+def write_report_file_streaming(
+    company_name: str,
+    fmt: Literal["markdown"] = "markdown",
+) -> Iterator[IO[bytes]]:
+    if fmt != "markdown":
+        raise ValueError(f"Unsupported streaming report format: {fmt}")
+
+    _ensure_outputs_dir()
+
+    file_path = _reserve_path(company_name, ".md")
+    try:
+        with file_path.open("wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            yield f
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
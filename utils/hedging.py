@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def hedge_delay_from_env() -> Optional[float]:
+    raw = os.getenv("LLM_HEDGE_AFTER_SECONDS")
+    if not raw:
+        return None
+    delay = float(raw)
+    return delay if delay > 0 else None
+
+
+async def hedged(call: Callable[[], Awaitable[T]], hedge_after: Optional[float]) -> T:
+    if hedge_after is None:
+        return await call()
+
+    tasks: List[asyncio.Future] = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            tasks.append(asyncio.ensure_future(call()))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+__all__ = ["hedged", "hedge_delay_from_env"]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+
+
+DEFAULT_TIMEOUT_SECONDS = 10.0
+MAX_KEEPALIVE_CONNECTIONS = 16
+
+_CLIENT: Optional[httpx.Client] = None
+_CLIENT_LOCK = threading.Lock()
+
+# httpx.AsyncClient connections are bound to the loop that opened them, so the
+# async pool is kept per running event loop rather than per process.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client() -> httpx.Client:
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = httpx.Client(
+                    http2=True,
+                    timeout=DEFAULT_TIMEOUT_SECONDS,
+                    limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+                )
+                atexit.register(_CLIENT.close)
+    return _CLIENT
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+        )
+    return client
+
+
+async def aclose_async_http_client() -> None:
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+__all__ = ["get_http_client", "get_async_http_client", "aclose_async_http_client"]
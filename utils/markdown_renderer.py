@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+
+NO_SOURCES_SENTENCE = "No sources were provided."
+
+
+def _as_items(value: Any) -> List[str]:
+    if isinstance(value, dict):
+        items = []
+        for key, item in value.items():
+            text = ", ".join(_as_items(item))
+            if text:
+                items.append(f"{key}: {text}")
+        return items
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            text = "; ".join(_as_items(item))
+            if text:
+                items.append(text)
+        return items
+    if value is None:
+        return []
+    text = str(value).strip()
+    return [text] if text else []
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value.strip()
+    return "\n".join(_as_items(value))
+
+
+def render_report(company_name: str, research: Dict[str, Any]) -> str:
+    company = _as_text(research.get("company")) or company_name
+    lines: List[str] = [f"# {company} Research Report", ""]
+
+    summary = _as_text(research.get("summary"))
+    if summary:
+        lines += ["## Summary", "", summary, ""]
+
+    products = _as_items(research.get("products"))
+    if products:
+        lines += ["## Products", ""] + [f"- {p}" for p in products] + [""]
+
+    financials = research.get("financials")
+    if isinstance(financials, dict):
+        items = _as_items(financials)
+        if items:
+            lines += ["## Financials", ""] + [f"- {item}" for item in items] + [""]
+    else:
+        financials = _as_text(financials)
+        if financials:
+            lines += ["## Financials", "", financials, ""]
+
+    competitors = _as_items(research.get("competitors"))
+    if competitors:
+        lines += ["## Competitors", ""] + [f"- {c}" for c in competitors] + [""]
+
+    sources = _as_items(research.get("sources"))
+    lines += ["## Sources", ""]
+    if sources:
+        lines += [f"- {url}" for url in sources]
+    else:
+        lines.append(NO_SOURCES_SENTENCE)
+
+    return "\n".join(lines) + "\n"
+
+
+__all__ = ["render_report", "NO_SOURCES_SENTENCE"]
@@ -1,17 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from enum import Enum
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Final, Literal, Optional
 
 
-class AgentName(str, Enum):
-    SUPERVISOR = "supervisor"
-    RESEARCHER = "researcher"
-    DOCUMENT_CREATOR = "document_creator"
+AgentName = Literal["supervisor", "researcher", "document_creator"]
 
+SUPERVISOR: Final = "supervisor"
+RESEARCHER: Final = "researcher"
+DOCUMENT_CREATOR: Final = "document_creator"
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class HandoffMessage:
     task_name: str
     payload: Any
@@ -21,4 +21,4 @@ class HandoffMessage:
     error: Optional[str] = None
 
 
-__all__ = ["HandoffMessage", "AgentName"]
+__all__ = ["HandoffMessage", "AgentName", "SUPERVISOR", "RESEARCHER", "DOCUMENT_CREATOR"]
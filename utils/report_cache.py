@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils import _json
+from utils.file_writer import OUTPUTS_DIR, _ensure_outputs_dir, _slugify
+
+
+CACHE_FILE = OUTPUTS_DIR / "cache.json"
+REPORT_CACHE_TTL_SECONDS = 24 * 3600
+REPORT_CACHE_MAX_ENTRIES = 256
+
+_ENTRIES: Optional[Dict[str, Dict[str, Any]]] = None
+_LOCK = threading.Lock()
+
+
+def _entries() -> Dict[str, Dict[str, Any]]:
+    global _ENTRIES
+    if _ENTRIES is None:
+        try:
+            entries = _json.loads(CACHE_FILE.read_bytes())
+        except (FileNotFoundError, _json.JSONDecodeError):
+            entries = {}
+        if not isinstance(entries, dict):
+            entries = {}
+        _ENTRIES = {k: v for k, v in entries.items() if isinstance(v, dict)}
+    return _ENTRIES
+
+
+def get_cached_report(company_name: str) -> Optional[Dict[str, Any]]:
+    with _LOCK:
+        entry = _entries().get(_slugify(company_name.strip()))
+    if entry is None:
+        return None
+    if time.time() - entry.get("created_at", 0) > REPORT_CACHE_TTL_SECONDS:
+        return None
+    if not Path(entry.get("file_path", "")).is_file():
+        return None
+    return entry
+
+
+def store_report(company_name: str, file_path: str, research: Any) -> None:
+    with _LOCK:
+        entries = _entries()
+        now = time.time()
+        key = _slugify(company_name.strip())
+        entries.pop(key, None)
+        entries[key] = {
+            "file_path": file_path,
+            "research": research,
+            "created_at": now,
+        }
+        for stale in [k for k, v in entries.items() if now - v.get("created_at", 0) > REPORT_CACHE_TTL_SECONDS]:
+            del entries[stale]
+        while len(entries) > REPORT_CACHE_MAX_ENTRIES:
+            del entries[next(iter(entries))]
+        _ensure_outputs_dir()
+        tmp_path = CACHE_FILE.with_suffix(".json.tmp")
+        tmp_path.write_text(_json.dumps(entries), encoding="utf-8")
+        tmp_path.replace(CACHE_FILE)
+
+
+__all__ = ["get_cached_report", "store_report"]
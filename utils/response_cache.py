@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Protocol
+
+from utils import _json
+
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_REDIS_TTL_SECONDS = 24 * 3600
+
+
+class ResponseCache(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+
+class InMemoryResponseCache:
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._data: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.max_entries:
+                del self._data[next(iter(self._data))]
+
+
+class RedisResponseCache:
+
+    def __init__(self, url: str, ttl_seconds: int = DEFAULT_REDIS_TTL_SECONDS) -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed") from exc
+
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self._client.get(key)
+        except Exception:
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str) -> None:
+        try:
+            self._client.set(key, value, ex=self.ttl_seconds)
+        except Exception:
+            pass
+
+
+def make_cache_key(namespace: str, fields: Dict[str, Any]) -> str:
+    blob = _json.dumps(fields, sort_keys=True).encode("utf-8")
+    return f"{namespace}:{hashlib.blake2b(blob, digest_size=16).hexdigest()}"
+
+
+@lru_cache(maxsize=1)
+def get_default_response_cache() -> ResponseCache:
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return RedisResponseCache(redis_url)
+    return InMemoryResponseCache()
+
+
+__all__ = [
+    "ResponseCache",
+    "InMemoryResponseCache",
+    "RedisResponseCache",
+    "make_cache_key",
+    "get_default_response_cache",
+]